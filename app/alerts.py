@@ -0,0 +1,231 @@
+import os
+import threading
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from app.database import SessionLocal, embeddings, vector_store
+from app.models import Alert, InterestProfile
+from app.trends import TOKEN_PATTERN, normalize_token
+
+# Alert Settings
+ALERT_SIMILARITY_THRESHOLD = float(os.getenv("ALERT_SIMILARITY_THRESHOLD", "0.7"))
+
+
+class ProfileMatcher:
+    """
+    All interest profiles in matrix form, so new chunks are matched against
+    every profile at once instead of running one search per profile.
+    - `vectors`: unit-norm query embeddings, one row per profile
+    - `keyword_index`: inverted index from keyword to profile rows
+    """
+
+    def __init__(self, profiles: List[InterestProfile]):
+        self.profile_ids = [profile.id for profile in profiles]
+        self.thresholds = np.array(
+            [ALERT_SIMILARITY_THRESHOLD if profile.threshold is None else profile.threshold for profile in profiles],
+            dtype=np.float32
+        )
+
+        vectors = [np.frombuffer(profile.embedding, dtype=np.float32) for profile in profiles]
+        self.vectors = _normalize(np.vstack(vectors)) if vectors else None
+
+        self.keyword_index = defaultdict(list)
+        for row, profile in enumerate(profiles):
+            for keyword in profile.keywords or []:
+                self.keyword_index[keyword.casefold()].append(row)
+
+    def match(self, documents: List[str], chunk_vectors: np.ndarray) -> List[Dict]:
+        """
+        Returns one match per (chunk, profile) pair that passes the similarity
+        threshold or contains one of the profile's keywords.
+        """
+        if not self.profile_ids or not documents:
+            return []
+
+        similarities = _normalize(chunk_vectors) @ self.vectors.T  # (chunks, profiles)
+        hits = similarities >= self.thresholds
+
+        keyword_hits = defaultdict(set)
+        for i, text in enumerate(documents):
+            for term in {keyword_term(token) for token in TOKEN_PATTERN.findall(text)}:
+                for row in self.keyword_index.get(term, ()):
+                    keyword_hits[(i, row)].add(term)
+
+        pairs = set(zip(*np.nonzero(hits))) | set(keyword_hits)
+        return [
+            {
+                "chunk": int(i),
+                "profile_id": self.profile_ids[row],
+                "score": float(similarities[i, row]),
+                "keywords": sorted(keyword_hits.get((i, row), ())),
+            }
+            for i, row in pairs
+        ]
+
+
+def keyword_term(token: str) -> str:
+    """
+    Keyword matching ignores case; trend terms keep acronyms such as "AI" in upper case.
+    """
+    return normalize_token(token).casefold()
+
+
+def normalize_keywords(keywords: List[str]) -> List[str]:
+    """
+    Keywords are matched against single chunk terms, so each one must be a single term.
+    Raises ValueError for keywords that would never match, such as phrases.
+    """
+    terms = set()
+    for keyword in keywords:
+        keyword = keyword.strip()
+        if not keyword:
+            continue
+        if not TOKEN_PATTERN.fullmatch(keyword):
+            raise ValueError(f"Keyword '{keyword}' must be a single word; add phrases as separate keywords.")
+        terms.add(keyword_term(keyword))
+    return sorted(terms)
+
+
+# Profiles can be created or deleted by another worker process, so the cached
+# matcher is checked against a cheap (count, max id) stamp of the profiles table.
+_matcher: Optional[ProfileMatcher] = None
+_matcher_version: Optional[Tuple[int, Optional[int]]] = None
+_matcher_lock = threading.Lock()
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    return vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+
+
+def get_matcher(db: Session) -> ProfileMatcher:
+    global _matcher, _matcher_version
+    version = tuple(db.query(func.count(InterestProfile.id), func.max(InterestProfile.id)).one())
+    with _matcher_lock:
+        if _matcher is None or version != _matcher_version:
+            _matcher = ProfileMatcher(db.query(InterestProfile).order_by(InterestProfile.id).all())
+            _matcher_version = version
+        return _matcher
+
+
+def invalidate_matcher():
+    global _matcher, _matcher_version
+    with _matcher_lock:
+        _matcher = None
+        _matcher_version = None
+
+
+def create_profile(db: Session, user_id: str, name: str, query: str,
+                   keywords: Optional[List[str]] = None, threshold: Optional[float] = None) -> InterestProfile:
+    """
+    Saves an interest profile. The query is embedded once here, never at match time.
+    """
+    keywords = normalize_keywords(keywords or [])
+    vector = np.asarray(embeddings.embed_query(query), dtype=np.float32)
+    profile = InterestProfile(
+        user_id=user_id,
+        name=name,
+        query=query,
+        keywords=keywords,
+        embedding=vector.tobytes(),
+        threshold=threshold,
+    )
+    db.add(profile)
+    try:
+        db.commit()
+        db.refresh(profile)
+    except Exception:
+        db.rollback()
+        raise
+    invalidate_matcher()
+    return profile
+
+
+def delete_profile(db: Session, profile: InterestProfile):
+    db.delete(profile)
+    try:
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    invalidate_matcher()
+
+
+def percolate_chunks(db: Session, ids: List[str], documents: List[str],
+                     metadatas: List[Dict], chunk_vectors: np.ndarray) -> int:
+    """
+    Matches newly indexed chunks against all interest profiles and writes
+    one alert per (profile, article). Returns the number of new alerts.
+    """
+    matches = get_matcher(db).match(documents, chunk_vectors)
+    if not matches:
+        return 0
+
+    # Keep the best matching chunk per (profile, article)
+    best = {}
+    for match in matches:
+        metadata = metadatas[match["chunk"]]
+        key = (match["profile_id"], metadata["url"])
+        current = best.get(key)
+        if current is None or match["score"] > current["score"]:
+            keywords = set(match["keywords"]) | set(current["keywords"] if current else ())
+            best[key] = {**match, "keywords": sorted(keywords), "title": metadata.get("title")}
+        else:
+            current["keywords"] = sorted(set(current["keywords"]) | set(match["keywords"]))
+
+    urls = {url for _, url in best}
+    existing = {
+        (alert.profile_id, alert.article_url)
+        for alert in db.query(Alert.profile_id, Alert.article_url).filter(Alert.article_url.in_(urls))
+    }
+
+    created = 0
+    for (profile_id, url), match in best.items():
+        if (profile_id, url) in existing:
+            continue
+        db.add(Alert(
+            profile_id=profile_id,
+            article_url=url,
+            title=match["title"],
+            chunk_id=ids[match["chunk"]],
+            score=match["score"],
+            matched_keywords=match["keywords"],
+        ))
+        created += 1
+
+    try:
+        db.commit()
+    except Exception as e:
+        print(f"Failed to save alerts: {e}")
+        db.rollback()
+        return 0
+    return created
+
+
+def percolate_new_chunks(ids: List[str]) -> int:
+    """
+    Entry point after indexing: loads the new chunks with the embeddings
+    ChromaDB already stored (nothing is re-embedded) and percolates them.
+    """
+    if not ids:
+        return 0
+
+    results = vector_store.get(ids=ids, include=["documents", "metadatas", "embeddings"])
+    if not results or not len(results["ids"]):
+        return 0
+
+    db = SessionLocal()
+    try:
+        created = percolate_chunks(
+            db,
+            results["ids"],
+            results["documents"],
+            results["metadatas"],
+            np.asarray(results["embeddings"], dtype=np.float32),
+        )
+        if created:
+            print(f"Created {created} alerts from {len(ids)} new chunks.")
+        return created
+    finally:
+        db.close()
@@ -3,6 +3,8 @@ from bs4 import BeautifulSoup
 from datetime import datetime
 from sqlalchemy.orm import Session
 from app.models import Article, Author
+from app.trends import record_article_terms
+from app.dedup import link_near_duplicate
 from typing import List, Optional
 import re
 import time
@@ -135,6 +137,12 @@ def crawl_article(db: Session, url: str, headers: dict) -> Optional[Article]:
     
     db.add(new_article)
     try:
+        # Near-duplicate links and trend aggregates are updated in the same transaction as the article.
+        # Republished copies are not counted again in the trends.
+        db.flush()
+        canonical = link_article(db, new_article)
+        if canonical is None:
+            record_article_terms(db, new_article)
         db.commit()
         db.refresh(new_article)
         return new_article
@@ -143,6 +151,21 @@ def crawl_article(db: Session, url: str, headers: dict) -> Optional[Article]:
         db.rollback()
         return None
 
+def link_article(db: Session, article: Article) -> Optional[Article]:
+    """
+    Runs near-duplicate linking in a savepoint: a failed lookup never costs the
+    article, which is then saved unsigned and indexed as a canonical article.
+    backfill_signatures.py registers unsigned articles later.
+    """
+    try:
+        with db.begin_nested():
+            return link_near_duplicate(db, article)
+    except Exception as e:
+        print(f"Failed to link near-duplicates for {article.url}: {e}")
+        article.signature = None
+        article.lsh_bands = []
+        return None
+
 def parse_date(date_str: str) -> datetime:
     """
     Parses date string like '2024.05.28 14:30' or '2024-05-28 14:30'
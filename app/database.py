@@ -4,6 +4,7 @@ from sqlalchemy.orm import sessionmaker
 from langchain_chroma import Chroma
 from langchain_google_genai import GoogleGenerativeAIEmbeddings
 from dotenv import load_dotenv
+from app.llm_gateway import GatewayEmbeddings, GEMINI_BASE_URL
 
 load_dotenv()
 
@@ -25,11 +26,12 @@ def get_db():
 # ChromaDB Setup (LangChain)
 CHROMA_DB_PATH = os.getenv("CHROMA_DB_PATH", "./chroma_db")
 
-# Initialize Embeddings
-embeddings = GoogleGenerativeAIEmbeddings(
+# Initialize Embeddings (all calls go through the Gemini gateway)
+embeddings = GatewayEmbeddings(GoogleGenerativeAIEmbeddings(
     model="models/text-embedding-004", 
-    google_api_key=os.getenv('GOOGLE_API_KEY')
-)
+    google_api_key=os.getenv('GOOGLE_API_KEY'),
+    base_url=GEMINI_BASE_URL
+))
 
 # Initialize Vector Store
 vector_store = Chroma(
@@ -0,0 +1,215 @@
+import os
+import re
+import zlib
+import hashlib
+from collections import defaultdict
+from datetime import datetime
+from typing import List, Optional, Set, Tuple
+import numpy as np
+from sqlalchemy.orm import Session
+from app.models import Article, ArticleSignature, ArticleLSHBand
+
+# MinHash / LSH Settings
+SHINGLE_SIZE = 5 # characters; works for Korean text without a tokenizer
+NUM_PERM = 128
+LSH_BANDS = 16 # 16 bands x 8 rows: candidates above ~0.7 Jaccard are found with high probability
+LSH_ROWS = NUM_PERM // LSH_BANDS
+NEAR_DUPLICATE_THRESHOLD = float(os.getenv("NEAR_DUPLICATE_THRESHOLD", "0.8"))
+QUERY_BATCH_SIZE = 500
+
+_MERSENNE_PRIME = np.uint64((1 << 31) - 1)
+_rng = np.random.default_rng(1234) # fixed so stored signatures stay comparable
+_PERM_A = _rng.integers(1, int(_MERSENNE_PRIME), size=NUM_PERM, dtype=np.uint64)
+_PERM_B = _rng.integers(0, int(_MERSENNE_PRIME), size=NUM_PERM, dtype=np.uint64)
+
+_WHITESPACE = re.compile(r"\s+")
+_SENTENCE_BOUNDARY = re.compile(r"\n+|(?<=[.!?])(?=\s|[가-힣\[(\"'“])")
+
+
+def normalize_text(text: str) -> str:
+    return _WHITESPACE.sub(" ", text or "").strip().lower()
+
+
+def shingles(text: str, k: int = SHINGLE_SIZE) -> Set[int]:
+    """
+    Hashes the character k-grams of the normalized text to 32-bit ints.
+    """
+    text = normalize_text(text)
+    if len(text) <= k:
+        return {zlib.crc32(text.encode("utf-8"))} if text else set()
+    return {zlib.crc32(text[i:i + k].encode("utf-8")) for i in range(len(text) - k + 1)}
+
+
+def minhash_signature(text: str) -> np.ndarray:
+    """
+    MinHash signature with NUM_PERM universal hash functions, vectorized over all shingles.
+    """
+    hashed = np.fromiter(shingles(text), dtype=np.uint64)
+    if hashed.size == 0:
+        return np.full(NUM_PERM, int(_MERSENNE_PRIME), dtype=np.uint32)
+    hashed %= _MERSENNE_PRIME
+    permuted = (np.outer(hashed, _PERM_A) + _PERM_B) % _MERSENNE_PRIME
+    return permuted.min(axis=0).astype(np.uint32)
+
+
+def estimate_similarity(a: np.ndarray, b: np.ndarray) -> float:
+    """
+    Estimated Jaccard similarity: the fraction of equal MinHash values.
+    """
+    return float(np.mean(a == b))
+
+
+def lsh_buckets(signature: np.ndarray) -> List[Tuple[int, str]]:
+    """
+    Splits the signature into LSH_BANDS bands and hashes each band to a bucket key.
+    Keys are prefixed with the band number, so they are unique across bands.
+    """
+    buckets = []
+    for band in range(LSH_BANDS):
+        rows = signature[band * LSH_ROWS:(band + 1) * LSH_ROWS].tobytes()
+        buckets.append((band, f"{band}:{hashlib.blake2b(rows, digest_size=8).hexdigest()}"))
+    return buckets
+
+
+def split_sentences(text: str) -> List[str]:
+    """
+    Splits text into sentences and lines. Crawled bodies have no line breaks,
+    so sentences are also split where the next one starts right after the period.
+    """
+    return [sentence for sentence in _SENTENCE_BOUNDARY.split(text or "") if normalize_text(sentence)]
+
+
+def link_near_duplicate(db: Session, article: Article) -> Optional[Article]:
+    """
+    Computes the article's MinHash signature and links it to a canonical article.
+    Only canonical articles are registered in the LSH buckets, so a near-duplicate
+    always points directly at its canonical article.
+    Does not commit; the caller commits it together with the article.
+    Returns the canonical article if this one is a near-duplicate.
+    """
+    signature = minhash_signature(article.content)
+    if article.id is None:
+        db.flush()
+
+    # Articles without content are never linked; they would all look identical
+    if not normalize_text(article.content):
+        article.signature = ArticleSignature(minhash=signature.tobytes())
+        return None
+
+    buckets = lsh_buckets(signature)
+
+    candidates = {
+        row.article_id
+        for row in db.query(ArticleLSHBand.article_id).filter(
+            ArticleLSHBand.bucket.in_([bucket for _, bucket in buckets])
+        )
+        if row.article_id != article.id
+    }
+
+    best_id, best_similarity = None, 0.0
+    if candidates:
+        for row in db.query(ArticleSignature).filter(ArticleSignature.article_id.in_(candidates)):
+            similarity = estimate_similarity(signature, np.frombuffer(row.minhash, dtype=np.uint32))
+            if similarity > best_similarity:
+                best_id, best_similarity = row.article_id, similarity
+
+    if best_id is not None and best_similarity >= NEAR_DUPLICATE_THRESHOLD:
+        article.signature = ArticleSignature(
+            minhash=signature.tobytes(), canonical_id=best_id, similarity=best_similarity
+        )
+        canonical = db.get(Article, best_id)
+        print(f"Near-duplicate of {canonical.url} ({best_similarity:.2f}): {article.url}")
+        return canonical
+
+    register_canonical(article, signature)
+    return None
+
+
+def register_canonical(article: Article, signature: np.ndarray):
+    """
+    Stores the article's signature and LSH buckets so later copies can be linked to it.
+    """
+    if article.signature is None:
+        article.signature = ArticleSignature(minhash=signature.tobytes())
+    else:
+        article.signature.canonical_id = None
+        article.signature.similarity = None
+    article.lsh_bands = [ArticleLSHBand(band=band, bucket=bucket) for band, bucket in lsh_buckets(signature)]
+
+
+def promote_duplicates(db: Session, archived_ids: List[int]) -> List[Article]:
+    """
+    Called before canonical articles are archived. For each of them, the oldest
+    near-duplicate that stays in the store becomes the new canonical article
+    (with its own LSH buckets) and the other duplicates are relinked to it.
+    Does not commit. Returns the surviving articles whose chunks were stored
+    under an archived URL and must be indexed again.
+    """
+    archived = set(archived_ids)
+    groups = defaultdict(list)
+    for i in range(0, len(archived_ids), QUERY_BATCH_SIZE):
+        for row in db.query(ArticleSignature).filter(
+            ArticleSignature.canonical_id.in_(archived_ids[i:i + QUERY_BATCH_SIZE])
+        ):
+            if row.article_id not in archived:
+                groups[row.canonical_id].append(row)
+
+    survivors = []
+    for rows in groups.values():
+        rows.sort(key=lambda row: (row.article.recent_write or datetime.min, row.article_id))
+        new_canonical = rows[0]
+        signature = np.frombuffer(new_canonical.minhash, dtype=np.uint32)
+        register_canonical(new_canonical.article, signature)
+
+        for row in rows[1:]:
+            row.canonical_id = new_canonical.article_id
+            row.similarity = estimate_similarity(signature, np.frombuffer(row.minhash, dtype=np.uint32))
+
+        print(f"Promoted {new_canonical.article.url} to canonical for {len(rows) - 1} near-duplicates.")
+        survivors.extend(row.article for row in rows)
+    return survivors
+
+
+def backfill_signatures(db: Session) -> int:
+    """
+    Registers articles crawled before near-duplicate detection existed, so new
+    copies of them are linked. They are registered as canonical articles and
+    not linked to each other, because their chunks are already indexed under
+    their own URLs. Returns the number of articles registered.
+    """
+    registered = 0
+    while True:
+        articles = (
+            db.query(Article)
+            .outerjoin(ArticleSignature, ArticleSignature.article_id == Article.id)
+            .filter(ArticleSignature.article_id.is_(None))
+            .order_by(Article.id)
+            .limit(QUERY_BATCH_SIZE)
+            .all()
+        )
+        if not articles:
+            break
+        for article in articles:
+            signature = minhash_signature(article.content)
+            if normalize_text(article.content):
+                register_canonical(article, signature)
+            else:
+                article.signature = ArticleSignature(minhash=signature.tobytes())
+        try:
+            db.commit()
+        except Exception as e:
+            print(f"Failed to backfill signatures: {e}")
+            db.rollback()
+            raise
+        registered += len(articles)
+    print(f"Backfilled signatures for {registered} articles.")
+    return registered
+
+
+def canonical_url(article: Article) -> Optional[str]:
+    """
+    URL of the canonical article if this article is a near-duplicate, else None.
+    """
+    if article.signature and article.signature.canonical_id:
+        return article.signature.canonical.url
+    return None
@@ -0,0 +1,230 @@
+import os
+import math
+import time
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+import pytz
+from langchain_core.prompts import ChatPromptTemplate
+from langchain_core.output_parsers import StrOutputParser
+from sqlalchemy.orm import Session
+from app.database import vector_store
+from app.models import Article, Digest
+from app.rag_graph import llm
+from app.llm_gateway import GatewayChatModel, PRIORITY_BACKGROUND
+
+# Digest Settings
+DIGEST_WINDOW_HOURS = int(os.getenv("DIGEST_WINDOW_HOURS", "24"))
+DIGEST_MAX_TOPICS = int(os.getenv("DIGEST_MAX_TOPICS", "8"))
+REPRESENTATIVE_CHUNKS = 4
+FETCH_BATCH_SIZE = 100
+
+kst = pytz.timezone('Asia/Seoul')
+
+# Same model as the RAG agent, but queued behind interactive queries
+digest_llm = GatewayChatModel(model=llm.model, priority=PRIORITY_BACKGROUND)
+
+# Digests are cached in memory per process. A rebuild refreshes the cache of the
+# process that ran it; other workers pick it up once their entry expires.
+DIGEST_CACHE_SECONDS = int(os.getenv("DIGEST_CACHE_SECONDS", "60"))
+_digest_cache: Dict[Optional[date], Tuple[float, Dict]] = {} # day (None = latest) -> (cached at, digest)
+
+summary_prompt = ChatPromptTemplate.from_template(
+    "다음은 같은 주제로 묶인 오늘의 주식&경제 뉴스 발췌문입니다.\n\n{context}\n\n"
+    "이 주제를 아침 브리핑용으로 정리하십시오.\n"
+    "첫 줄에는 주제 제목만 쓰고, 다음 줄부터 핵심 내용을 3~5문장으로 요약하십시오."
+)
+
+
+def build_daily_digest(db: Session, day: Optional[date] = None) -> Optional[Dict]:
+    """
+    Builds and stores the morning digest.
+    1. Loads the chunks (with their stored embeddings) of articles published
+       in the last DIGEST_WINDOW_HOURS from ChromaDB. Nothing is re-embedded.
+    2. Clusters the chunk embeddings into topics.
+    3. Summarizes each topic once with the LLM.
+    Nothing is saved when no topic could be summarized, or when some failed and
+    the stored digest has more topics, so a run during an outage keeps a good digest.
+    """
+    now = datetime.now(kst).replace(tzinfo=None)  # recent_write is stored in KST
+    day = day or now.date()
+    window_end = min(now, datetime.combine(day, datetime.max.time()))
+    window_start = window_end - timedelta(hours=DIGEST_WINDOW_HOURS)
+
+    articles = db.query(Article).filter(
+        Article.recent_write > window_start,
+        Article.recent_write <= window_end
+    ).all()
+    if not articles:
+        print(f"No articles for the {day} digest.")
+        return None
+
+    chunks = fetch_chunks([article.url for article in articles])
+    if not chunks["ids"]:
+        print(f"No indexed chunks for the {day} digest.")
+        return None
+
+    vectors = np.asarray(chunks["embeddings"], dtype=np.float32)
+    n_clusters = min(DIGEST_MAX_TOPICS, len(articles), max(1, round(math.sqrt(len(vectors) / 2))))
+    labels, centroids = cluster_embeddings(vectors, n_clusters)
+
+    topics = []
+    failed = 0
+    for cluster in range(n_clusters):
+        members = np.flatnonzero(labels == cluster)
+        if len(members) == 0:
+            continue
+        topic = summarize_cluster(
+            [chunks["documents"][i] for i in members],
+            [chunks["metadatas"][i] for i in members],
+            vectors[members] @ centroids[cluster],
+        )
+        if topic:
+            topics.append(topic)
+        else:
+            failed += 1
+
+    if not topics:
+        print(f"No topics could be summarized for the {day} digest; keeping the stored one.")
+        return None
+
+    digest = db.query(Digest).filter(Digest.day == day).first()
+    # A partial rebuild (e.g. under quota errors) never replaces a more complete digest
+    if digest and failed and len(topics) < len(digest.topics or []):
+        print(f"Only {len(topics)} of {n_clusters} topics summarized for the {day} digest; keeping the stored one.")
+        return None
+
+    topics.sort(key=lambda t: len(t["articles"]), reverse=True)
+
+    if not digest:
+        digest = Digest(day=day)
+        db.add(digest)
+    digest.topics = topics
+    digest.article_count = len(articles)
+    digest.chunk_count = len(vectors)
+    digest.created_at = datetime.utcnow()
+
+    try:
+        db.commit()
+        db.refresh(digest)
+    except Exception as e:
+        print(f"Failed to save digest for {day}: {e}")
+        db.rollback()
+        return None
+
+    result = digest_to_dict(digest)
+    _digest_cache[day] = (time.monotonic(), result)
+    _digest_cache.pop(None, None)  # the latest digest may have changed
+    print(f"Built {day} digest with {len(topics)} topics from {len(vectors)} chunks.")
+    return result
+
+
+def fetch_chunks(urls: List[str]) -> Dict[str, List]:
+    """
+    Loads chunk texts, metadata and stored embeddings for the given article URLs.
+    """
+    chunks = {"ids": [], "documents": [], "metadatas": [], "embeddings": []}
+    for i in range(0, len(urls), FETCH_BATCH_SIZE):
+        results = vector_store.get(
+            where={"url": {"$in": urls[i:i + FETCH_BATCH_SIZE]}},
+            include=["documents", "metadatas", "embeddings"]
+        )
+        if not results or not len(results["ids"]):
+            continue
+        for key in chunks:
+            chunks[key].extend(results[key])
+    return chunks
+
+
+def cluster_embeddings(vectors: np.ndarray, n_clusters: int, n_iter: int = 25, seed: int = 0):
+    """
+    Spherical k-means (cosine similarity) with k-means++ initialisation.
+    Returns (labels, unit-norm centroids).
+    """
+    rng = np.random.default_rng(seed)
+    unit = vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+
+    # k-means++ seeding on cosine distance
+    centroids = [unit[rng.integers(len(unit))]]
+    for _ in range(1, n_clusters):
+        distances = np.clip(1 - np.max(unit @ np.array(centroids).T, axis=1), 0, None)
+        total = distances.sum()
+        probs = distances / total if total > 0 else None
+        centroids.append(unit[rng.choice(len(unit), p=probs)])
+    centroids = np.array(centroids)
+
+    labels = np.full(len(unit), -1)
+    for _ in range(n_iter):
+        new_labels = np.argmax(unit @ centroids.T, axis=1)
+        if np.array_equal(new_labels, labels):
+            break
+        labels = new_labels
+        for k in range(n_clusters):
+            members = unit[labels == k]
+            if len(members):
+                centroid = members.sum(axis=0)
+                centroids[k] = centroid / max(np.linalg.norm(centroid), 1e-12)
+
+    return labels, centroids
+
+
+def summarize_cluster(documents: List[str], metadatas: List[Dict], similarities: np.ndarray) -> Optional[Dict]:
+    """
+    Summarizes one topic with a single LLM call over its most central chunks.
+    """
+    order = np.argsort(-similarities)
+    context = "\n\n".join(
+        f"[{metadatas[i].get('title', '')}]\n{documents[i]}" for i in order[:REPRESENTATIVE_CHUNKS]
+    )
+
+    articles = {}
+    for i in order:
+        url = metadatas[i].get("url")
+        if url and url not in articles:
+            articles[url] = {"title": metadatas[i].get("title", ""), "url": url}
+
+    try:
+        chain = summary_prompt | digest_llm | StrOutputParser()
+        output = chain.invoke({"context": context}).strip()
+    except Exception as e:
+        print(f"Failed to summarize topic: {e}")
+        return None
+
+    title, _, summary = output.partition("\n")
+    return {
+        "title": title.strip().strip("#* "),
+        "summary": summary.strip(),
+        "articles": list(articles.values()),
+        "chunk_count": len(documents),
+    }
+
+
+def digest_to_dict(digest: Digest) -> Dict:
+    return {
+        "day": digest.day.isoformat(),
+        "topics": digest.topics or [],
+        "article_count": digest.article_count,
+        "chunk_count": digest.chunk_count,
+        "created_at": digest.created_at.isoformat() if digest.created_at else None,
+    }
+
+
+def get_digest(db: Session, day: Optional[date] = None) -> Optional[Dict]:
+    """
+    Returns the stored digest for `day` (the latest one if not given),
+    from the in-memory cache when it is fresh enough.
+    """
+    cached = _digest_cache.get(day)
+    if cached and time.monotonic() - cached[0] < DIGEST_CACHE_SECONDS:
+        return cached[1]
+
+    query = db.query(Digest)
+    digest = query.filter(Digest.day == day).first() if day else query.order_by(Digest.day.desc()).first()
+    if not digest:
+        return None
+
+    result = digest_to_dict(digest)
+    now = time.monotonic()
+    _digest_cache[day] = (now, result)
+    _digest_cache[digest.day] = (now, result)
+    return result
@@ -1,15 +1,23 @@
 from typing import List, Dict
+from datetime import datetime
 from app.database import vector_store
 from langchain_core.documents import Document
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 from uuid import uuid4
+from app.models import Article
+from app.dedup import normalize_text, split_sentences, canonical_url
+from app.alerts import percolate_new_chunks
 
 
-def index_to_chroma(news_items: List[Dict]):
+def index_to_chroma(news_items: List[Dict], percolate: bool = True):
     """
     Index a list of news items to ChromaDB using LangChain wrapper.
     Expected format for news_items: 
-    [{"id": str, "title": str, "content": str, "url": str, "authors": List[str], "recent_write": str}]
+    [{"id": str, "title": str, "content": str, "url": str, "authors": List[str], "recent_write": str, "canonical_url": Optional[str]}]
+    Near-duplicates (items with a canonical_url) are stored under the canonical URL,
+    and only their sentences that the canonical article does not already have are embedded.
+    New chunks are matched against the interest profiles unless `percolate` is False,
+    e.g. when re-indexing articles that users were already alerted about.
     """
 
     # Check for existing URLs
@@ -18,7 +26,8 @@ def index_to_chroma(news_items: List[Dict]):
     
     for item in news_items:
         # Check if URL already exists
-        results = vector_store.get(where={"url": item["url"]})
+        where = {"source_url": item["url"]} if item.get("canonical_url") else {"url": item["url"]}
+        results = vector_store.get(where=where)
         if results and results["ids"]:
             skipped_count += 1
             continue
@@ -37,15 +46,20 @@ def index_to_chroma(news_items: List[Dict]):
             page_content=item["content"], 
             metadata={
                 "title": item["title"],
-                "url": item["url"],
+                "url": item.get("canonical_url") or item["url"],
+                "source_url": item["url"],
                 "authors": ", ".join(item.get("authors", [])) if isinstance(item.get("authors"), list) else str(item.get("authors", "Unknown")),
-                "published_at": item.get("recent_write", datetime.now()).isoformat()
+                "published_at": (item.get("recent_write") or datetime.now()).isoformat()
             }
         ) 
         for item in new_items
     ]
 
-    documents = split_documents(documents)
+    documents = split_documents(filter_known_sentences(documents))
+
+    if not documents:
+        print("No new content to index.")
+        return len(new_items), skipped_count
 
     ids = [str(uuid4()) for _ in range(len(documents))]
 
@@ -54,12 +68,96 @@ def index_to_chroma(news_items: List[Dict]):
             documents=documents,
             ids=ids
         )
-        print(f"Successfully indexed {len(new_items)} articles to ChromaDB.")
-        return len(new_items), skipped_count
+        print(f"Successfully indexed {len(new_items)} articles ({len(documents)} chunks) to ChromaDB.")
     except Exception as e:
         print(f"Error indexing to ChromaDB: {e}")
         return 0, skipped_count
 
+    # Match the new chunks against the users' interest profiles
+    if percolate:
+        try:
+            percolate_new_chunks(ids)
+        except Exception as e:
+            print(f"Error creating alerts: {e}")
+
+    return len(new_items), skipped_count
+
+def filter_known_sentences(documents: List[Document]) -> List[Document]:
+    """
+    Drops the sentences of near-duplicates that are already indexed under their
+    canonical URL, before the documents are split. Republished, updated or
+    syndicated copies then only embed their new or changed sentences, and a
+    changed header or footer does not shift every chunk boundary.
+    """
+    by_url = {}
+    for doc in documents:
+        by_url.setdefault(doc.metadata["url"], []).append(doc)
+
+    kept = []
+    dropped = 0
+    for url, docs in by_url.items():
+        # Only near-duplicates share a URL with content that is already indexed
+        if all(doc.metadata["source_url"] == url for doc in docs):
+            kept.extend(docs)
+            continue
+
+        indexed = indexed_texts(url)
+        seen = set()
+        for doc in docs:
+            sentences = split_sentences(doc.page_content)
+            if doc.metadata["source_url"] == url:
+                seen.update(normalize_text(sentence) for sentence in sentences)
+                kept.append(doc)
+                continue
+
+            new_sentences = []
+            for sentence in sentences:
+                key = normalize_text(sentence)
+                if key in seen or any(key in text for text in indexed):
+                    dropped += 1
+                    continue
+                seen.add(key)
+                new_sentences.append(sentence.strip())
+            if new_sentences:
+                doc.page_content = " ".join(new_sentences)
+                kept.append(doc)
+
+    if dropped:
+        print(f"Skipped {dropped} sentences already indexed under their canonical article.")
+    return kept
+
+def indexed_texts(url: str) -> List[str]:
+    """
+    Rebuilds the normalized text of each article stored under `url` from its
+    chunks, using their start offsets, so sentences cut at a chunk boundary are found too.
+    """
+    results = vector_store.get(where={"url": url}, include=["documents", "metadatas"])
+    chunks = {}
+    for text, metadata in zip(results.get("documents") or [], results.get("metadatas") or []):
+        chunks.setdefault(metadata.get("source_url"), []).append((metadata.get("start_index", -1), text))
+
+    texts = []
+    for parts in chunks.values():
+        full = ""
+        for start, text in sorted(parts, key=lambda part: part[0]):
+            full = full[:start] + text if 0 <= start <= len(full) else f"{full} {text}"
+        texts.append(normalize_text(full))
+    return texts
+
+def article_to_news_item(article: Article) -> Dict:
+    """
+    Converts an Article row into the news item dict expected by index_to_chroma.
+    """
+    return {
+        "id": str(article.id),
+        "title": article.title,
+        "content": article.content,
+        "url": article.url,
+        "authors": [a.name for a in article.authors],
+        "recent_write": article.recent_write,
+        "canonical_url": canonical_url(article)
+    }
+
 def split_documents(documents: List[Document]):
     text_splitter = RecursiveCharacterTextSplitter(chunk_size = 1000, chunk_overlap = 200, add_start_index=True)
     return text_splitter.split_documents(documents)
@@ -0,0 +1,377 @@
+import os
+import re
+import math
+import time
+import string
+import heapq
+import random
+import itertools
+import threading
+from collections import defaultdict, deque
+from typing import Any, Callable, Dict, List, Optional
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import BaseMessage
+from langchain_core.outputs import ChatResult
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Gateway Settings
+# Point GEMINI_BASE_URL at a local fake server (benchmarks/fake_gemini_server.py) for testing
+GEMINI_BASE_URL = os.getenv("GEMINI_BASE_URL") or None
+CHAT_REQUESTS_PER_MINUTE = int(os.getenv("GEMINI_CHAT_RPM", "60"))
+CHAT_TOKENS_PER_MINUTE = int(os.getenv("GEMINI_CHAT_TPM", "1000000"))
+EMBED_REQUESTS_PER_MINUTE = int(os.getenv("GEMINI_EMBED_RPM", "100"))
+EMBED_TOKENS_PER_MINUTE = int(os.getenv("GEMINI_EMBED_TPM", "1000000"))
+# Bucket capacity in seconds of budget; spreads a minute's budget instead of spending it in one burst
+BURST_SECONDS = float(os.getenv("GEMINI_BURST_SECONDS", "1"))
+MAX_RETRIES = int(os.getenv("GEMINI_MAX_RETRIES", "5"))
+RETRY_BASE_DELAY = float(os.getenv("GEMINI_RETRY_BASE_DELAY", "1.0"))
+RETRY_MAX_DELAY = float(os.getenv("GEMINI_RETRY_MAX_DELAY", "30.0"))
+EMBED_BATCH_SIZE = 100 # Gemini accepts at most 100 texts per embedding request
+EMBED_BATCH_TOKENS = 20000 # the embeddings client splits larger batches into several requests
+EMBED_BATCH_WAIT = float(os.getenv("GEMINI_EMBED_BATCH_WAIT_MS", "20")) / 1000
+EMBED_WORKERS = 2
+
+# Lower value is served first
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BACKGROUND = 1
+
+WAIT_SAMPLES = 1000 # admission waits kept per priority for stats()
+CHARS_PER_TOKEN = 3 # rough estimate for mixed Korean/English text
+_EMBED_TOKEN_SPLIT = re.compile(f"([{re.escape(string.punctuation)}\t\n ])")
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+RETRYABLE_MESSAGES = ("RESOURCE_EXHAUSTED", "UNAVAILABLE", "DEADLINE_EXCEEDED", "quota", "rate limit")
+
+
+def estimate_tokens(text: str) -> int:
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def estimate_embed_tokens(text: str) -> int:
+    """
+    The estimate GoogleGenerativeAIEmbeddings uses to split its batches
+    (two tokens per word, punctuation or whitespace character). Batches built
+    with it stay a single API request, so one limiter admission is one request.
+    """
+    return 2 * sum(1 for segment in _EMBED_TOKEN_SPLIT.split(text) if segment)
+
+
+def is_retryable(error: BaseException) -> bool:
+    """
+    Quota and transient server errors are retried; anything else fails fast.
+    The LangChain clients wrap the SDK errors, so the cause chain is checked too.
+    """
+    while error is not None:
+        status = getattr(error, "code", None) or getattr(error, "status_code", None)
+        if status in RETRYABLE_STATUS:
+            return True
+        message = str(error)
+        if any(marker.lower() in message.lower() for marker in RETRYABLE_MESSAGES):
+            return True
+        error = error.__cause__
+    return False
+
+
+class RateLimiter:
+    """
+    Token buckets for requests and tokens per minute, refilled continuously
+    and holding at most `burst_seconds` worth of budget.
+    Waiting callers are admitted strictly in (priority, arrival) order,
+    and the recent admission waits are kept per priority for stats().
+    """
+
+    def __init__(self, requests_per_minute: int, tokens_per_minute: int, burst_seconds: float = BURST_SECONDS):
+        self.request_rate = requests_per_minute / 60
+        self.token_rate = tokens_per_minute / 60
+        self.request_capacity = max(1.0, self.request_rate * burst_seconds)
+        self.token_capacity = max(1.0, self.token_rate * burst_seconds)
+        self._requests = self.request_capacity
+        self._tokens = self.token_capacity
+        self._updated = time.monotonic()
+        self._waiting = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._admitted = defaultdict(int)
+        self._waits = defaultdict(lambda: deque(maxlen=WAIT_SAMPLES))
+
+    def _refill(self):
+        now = time.monotonic()
+        elapsed = now - self._updated
+        self._updated = now
+        self._requests = min(self.request_capacity, self._requests + elapsed * self.request_rate)
+        self._tokens = min(self.token_capacity, self._tokens + elapsed * self.token_rate)
+
+    def _seconds_until_available(self, tokens: float) -> float:
+        missing_requests = max(0.0, 1 - self._requests)
+        missing_tokens = max(0.0, tokens - self._tokens)
+        return max(missing_requests / self.request_rate, missing_tokens / self.token_rate)
+
+    def acquire(self, tokens: int, priority: int = PRIORITY_INTERACTIVE) -> float:
+        """
+        Blocks until the call is admitted and returns the tokens actually charged,
+        which are capped at the bucket capacity.
+        """
+        tokens = min(float(tokens), self.token_capacity)
+        ticket = (priority, next(self._seq))
+        start = time.monotonic()
+        with self._cond:
+            heapq.heappush(self._waiting, ticket)
+            try:
+                while True:
+                    self._refill()
+                    timeout = None
+                    if self._waiting[0] == ticket:
+                        timeout = self._seconds_until_available(tokens)
+                        if timeout <= 0:
+                            heapq.heappop(self._waiting)
+                            self._requests -= 1
+                            self._tokens -= tokens
+                            self._admitted[priority] += 1
+                            self._waits[priority].append(time.monotonic() - start)
+                            self._cond.notify_all()
+                            return tokens
+                    self._cond.wait(timeout)
+            except BaseException:
+                if ticket in self._waiting:
+                    self._waiting.remove(ticket)
+                    heapq.heapify(self._waiting)
+                    self._cond.notify_all()
+                raise
+
+    def stats(self) -> Dict[int, Dict[str, float]]:
+        """
+        Admission count and wait in seconds (mean, p95 over the recent waits) per priority.
+        """
+        with self._cond:
+            result = {}
+            for priority, waits in sorted(self._waits.items()):
+                ordered = sorted(waits)
+                result[priority] = {
+                    "admitted": self._admitted[priority],
+                    "avg_wait": sum(ordered) / len(ordered),
+                    "p95_wait": ordered[math.ceil(len(ordered) * 0.95) - 1],
+                }
+            return result
+
+    def adjust(self, tokens: int):
+        """
+        Charges (or refunds, if negative) the difference between the
+        estimated and the reported token usage of a finished call.
+        """
+        with self._cond:
+            self._refill()
+            self._tokens = min(self.token_capacity, self._tokens - tokens)
+            self._cond.notify_all()
+
+
+class GeminiGateway:
+    """
+    Single entry point for every Gemini call: rate limits per model kind,
+    priority between interactive and background work, and retries with
+    jittered exponential backoff.
+    """
+
+    def __init__(self, limiters: Dict[str, RateLimiter], max_retries: int = MAX_RETRIES,
+                 base_delay: float = RETRY_BASE_DELAY, max_delay: float = RETRY_MAX_DELAY):
+        self.limiters = limiters
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def call(self, kind: str, fn: Callable[[], Any], priority: int = PRIORITY_INTERACTIVE, tokens: int = 1,
+             usage: Optional[Callable[[Any], Optional[int]]] = None) -> Any:
+        """
+        Runs `fn` once admitted by the `kind` limiter. `usage` reads the actual
+        token usage from the result; the limiter is then corrected by the
+        difference to the tokens it charged.
+        """
+        limiter = self.limiters[kind]
+        for attempt in range(self.max_retries + 1):
+            charged = limiter.acquire(tokens, priority)
+            try:
+                result = fn()
+                actual = usage(result) if usage else None
+                if actual:
+                    limiter.adjust(actual - charged)
+                return result
+            except Exception as e:
+                if attempt >= self.max_retries or not is_retryable(e):
+                    raise
+                # Full jitter keeps concurrent retries from hitting the quota together
+                delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+                print(f"Gemini {kind} call failed ({e}). Retrying in {delay:.1f}s...")
+                time.sleep(delay)
+
+
+gateway = GeminiGateway({
+    "chat": RateLimiter(CHAT_REQUESTS_PER_MINUTE, CHAT_TOKENS_PER_MINUTE),
+    "embed": RateLimiter(EMBED_REQUESTS_PER_MINUTE, EMBED_TOKENS_PER_MINUTE),
+})
+
+
+class GatewayChatModel(BaseChatModel):
+    """
+    Chat model wrapper that sends every generation through the gateway.
+    Tool binding is delegated to the wrapped model, so the formatted tools
+    are passed back to it on each call.
+    """
+
+    model: BaseChatModel
+    priority: int = PRIORITY_INTERACTIVE
+
+    @property
+    def _llm_type(self) -> str:
+        return "gemini-gateway"
+
+    def bind_tools(self, tools, **kwargs):
+        bound = self.model.bind_tools(tools, **kwargs)
+        return self.bind(**bound.kwargs)
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                  run_manager=None, **kwargs: Any) -> ChatResult:
+        return gateway.call(
+            "chat",
+            lambda: self.model._generate(messages, stop=stop, **kwargs),
+            priority=self.priority,
+            tokens=sum(estimate_tokens(str(m.content)) for m in messages),
+            usage=_total_tokens,
+        )
+
+
+def _total_tokens(result: ChatResult) -> Optional[int]:
+    usage = getattr(result.generations[0].message, "usage_metadata", None) if result.generations else None
+    return usage.get("total_tokens") if usage else None
+
+
+class _EmbedRequest:
+    def __init__(self, texts: List[str], task_type: str, priority: int, seq: int):
+        self.texts = texts
+        self.request_tokens = sum(estimate_embed_tokens(text) for text in texts)
+        self.task_type = task_type
+        self.priority = priority
+        self.seq = seq
+        self.done = threading.Event()
+        self.result: Optional[List[List[float]]] = None
+        self.error: Optional[BaseException] = None
+
+
+class GatewayEmbeddings(Embeddings):
+    """
+    Embeddings wrapper that coalesces concurrent requests into batched calls.
+    Requests arriving within EMBED_BATCH_WAIT of each other share one API call
+    of up to EMBED_BATCH_SIZE texts and EMBED_BATCH_TOKENS estimated tokens.
+    Queries are interactive, documents are background.
+    """
+
+    def __init__(self, embeddings: Embeddings, batch_size: int = EMBED_BATCH_SIZE,
+                 max_wait: float = EMBED_BATCH_WAIT, workers: int = EMBED_WORKERS,
+                 batch_tokens: int = EMBED_BATCH_TOKENS):
+        self.embeddings = embeddings
+        self.batch_size = batch_size
+        self.batch_tokens = batch_tokens
+        self.max_wait = max_wait
+        self.workers = workers
+        self._pending: List[_EmbedRequest] = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._threads: List[threading.Thread] = []
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self._embed(texts, "RETRIEVAL_DOCUMENT", PRIORITY_BACKGROUND)
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._embed([text], "RETRIEVAL_QUERY", PRIORITY_INTERACTIVE)[0]
+
+    def _embed(self, texts: List[str], task_type: str, priority: int) -> List[List[float]]:
+        if not texts:
+            return []
+        requests, batch, batch_tokens = [], [], 0
+        for text in texts:
+            tokens = estimate_embed_tokens(text)
+            if batch and (len(batch) == self.batch_size or batch_tokens + tokens > self.batch_tokens):
+                requests.append(_EmbedRequest(batch, task_type, priority, next(self._seq)))
+                batch, batch_tokens = [], 0
+            batch.append(text)
+            batch_tokens += tokens
+        requests.append(_EmbedRequest(batch, task_type, priority, next(self._seq)))
+
+        with self._cond:
+            self._start_workers()
+            self._pending.extend(requests)
+            self._cond.notify_all()
+
+        vectors = []
+        for request in requests:
+            request.done.wait()
+            if request.error:
+                raise request.error
+            vectors.extend(request.result)
+        return vectors
+
+    def _start_workers(self):
+        self._threads = [t for t in self._threads if t.is_alive()]
+        while len(self._threads) < self.workers:
+            thread = threading.Thread(target=self._worker, daemon=True, name="gemini-embed-batcher")
+            thread.start()
+            self._threads.append(thread)
+
+    def _next_batch(self) -> List[_EmbedRequest]:
+        """
+        Waits for pending requests, gives others up to `max_wait` to join,
+        then takes the most urgent task type's requests up to `batch_size` texts
+        and `batch_tokens` estimated tokens.
+        """
+        with self._cond:
+            while not self._pending:
+                self._cond.wait()
+
+            deadline = time.monotonic() + self.max_wait
+            while (sum(len(r.texts) for r in self._pending) < self.batch_size
+                   and sum(r.request_tokens for r in self._pending) < self.batch_tokens):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            if not self._pending:
+                return []
+
+            self._pending.sort(key=lambda r: (r.priority, r.seq))
+            task_type = self._pending[0].task_type
+            batch, size, tokens = [], 0, 0
+            for request in self._pending:
+                if request.task_type != task_type or size + len(request.texts) > self.batch_size:
+                    continue
+                # The first request always fits; _embed already splits requests to the limits
+                if batch and tokens + request.request_tokens > self.batch_tokens:
+                    continue
+                batch.append(request)
+                size += len(request.texts)
+                tokens += request.request_tokens
+            self._pending = [r for r in self._pending if r not in batch]
+            return batch
+
+    def _worker(self):
+        while True:
+            batch = self._next_batch()
+            if not batch:
+                continue
+            texts = [text for request in batch for text in request.texts]
+            try:
+                vectors = gateway.call(
+                    "embed",
+                    lambda: self.embeddings.embed_documents(texts, task_type=batch[0].task_type),
+                    priority=min(r.priority for r in batch),
+                    tokens=sum(estimate_tokens(text) for text in texts),
+                )
+                offset = 0
+                for request in batch:
+                    request.result = vectors[offset:offset + len(request.texts)]
+                    offset += len(request.texts)
+            except Exception as e:
+                for request in batch:
+                    request.error = e
+            finally:
+                for request in batch:
+                    request.done.set()
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Table, ForeignKey
+from sqlalchemy import Column, Integer, Float, Boolean, String, Date, DateTime, Table, ForeignKey, UniqueConstraint, Index, JSON, LargeBinary
 from sqlalchemy.orm import declarative_base, relationship # type: ignore
 from datetime import datetime
 
@@ -37,6 +37,102 @@ class Article(Base):
     crawled_at = Column(DateTime, default=datetime.utcnow)
 
     authors = relationship("Author", secondary=article_author_association, back_populates="articles")
+    signature = relationship(
+        "ArticleSignature", uselist=False, cascade="all, delete-orphan",
+        foreign_keys="ArticleSignature.article_id", back_populates="article"
+    )
+    lsh_bands = relationship("ArticleLSHBand", cascade="all, delete-orphan", back_populates="article")
 
     def __repr__(self):
         return f"<Article(title={self.title}, url={self.url})>"
+
+class ArticleSignature(Base):
+    __tablename__ = "article_signatures"
+
+    article_id = Column(Integer, ForeignKey('articles.id'), primary_key=True)
+    minhash = Column(LargeBinary) # MinHash signature of the content shingles
+    canonical_id = Column(Integer, ForeignKey('articles.id'), nullable=True, index=True) # set for near-duplicates
+    similarity = Column(Float, nullable=True) # estimated Jaccard similarity to the canonical article
+
+    article = relationship("Article", foreign_keys=[article_id], back_populates="signature")
+    canonical = relationship("Article", foreign_keys=[canonical_id])
+
+    def __repr__(self):
+        return f"<ArticleSignature(article_id={self.article_id}, canonical_id={self.canonical_id})>"
+
+class ArticleLSHBand(Base):
+    __tablename__ = "article_lsh_bands"
+
+    id = Column(Integer, primary_key=True, index=True)
+    band = Column(Integer, nullable=False)
+    bucket = Column(String, nullable=False, index=True) # "<band>:<hash of the signature rows in this band>"
+    article_id = Column(Integer, ForeignKey('articles.id'), nullable=False, index=True)
+
+    article = relationship("Article", back_populates="lsh_bands")
+
+class TermDailyCount(Base):
+    __tablename__ = "term_daily_counts"
+    __table_args__ = (
+        UniqueConstraint("day", "kind", "term", name="uq_term_daily_counts_day_kind_term"),
+        Index("ix_term_daily_counts_kind_day", "kind", "day"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    day = Column(Date, nullable=False) # publish date of the articles
+    kind = Column(String, nullable=False) # "keyword" or "company"
+    term = Column(String, nullable=False)
+    count = Column(Integer, nullable=False, default=0) # number of articles mentioning the term
+
+    def __repr__(self):
+        return f"<TermDailyCount(day={self.day}, kind={self.kind}, term={self.term}, count={self.count})>"
+
+class Digest(Base):
+    __tablename__ = "digests"
+
+    id = Column(Integer, primary_key=True, index=True)
+    day = Column(Date, unique=True, index=True) # KST date of the morning digest
+    topics = Column(JSON) # [{"title", "summary", "articles": [{"title", "url"}], "chunk_count"}]
+    article_count = Column(Integer, default=0)
+    chunk_count = Column(Integer, default=0)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<Digest(day={self.day}, topics={len(self.topics or [])})>"
+
+class InterestProfile(Base):
+    __tablename__ = "interest_profiles"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(String, index=True)
+    name = Column(String)
+    query = Column(String) # the user's standing query
+    keywords = Column(JSON) # normalized keywords for the inverted index
+    embedding = Column(LargeBinary) # float32 embedding of the query, computed once
+    threshold = Column(Float) # minimum cosine similarity for a match
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    alerts = relationship("Alert", cascade="all, delete-orphan", back_populates="profile")
+
+    def __repr__(self):
+        return f"<InterestProfile(user_id={self.user_id}, name={self.name})>"
+
+class Alert(Base):
+    __tablename__ = "alerts"
+    __table_args__ = (
+        UniqueConstraint("profile_id", "article_url", name="uq_alerts_profile_article"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    profile_id = Column(Integer, ForeignKey('interest_profiles.id'), nullable=False, index=True)
+    article_url = Column(String, nullable=False)
+    title = Column(String)
+    chunk_id = Column(String) # best matching chunk in ChromaDB
+    score = Column(Float) # cosine similarity of the best matching chunk
+    matched_keywords = Column(JSON)
+    is_read = Column(Boolean, default=False, index=True)
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
+
+    profile = relationship("InterestProfile", back_populates="alerts")
+
+    def __repr__(self):
+        return f"<Alert(profile_id={self.profile_id}, article_url={self.article_url})>"
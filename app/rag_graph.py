@@ -5,6 +5,7 @@ from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import StrOutputParser
 from langgraph.graph import StateGraph, END
 from app.database import vector_store
+from app.llm_gateway import GatewayChatModel, GEMINI_BASE_URL
 from dotenv import load_dotenv
 from langchain_core.tools import tool
 from langchain_core.messages import BaseMessage, SystemMessage, HumanMessage, ToolMessage
@@ -18,8 +19,15 @@ class AgentState(TypedDict):
     retry_count: int
 
 # LLM Setup
-llm = ChatGoogleGenerativeAI(model="gemini-2.5-flash", temperature=0, api_key=os.getenv('GOOGLE_API_KEY'))
-decision_llm = ChatGoogleGenerativeAI(model="gemini-2.5-flash", temperature=0, api_key=os.getenv('GOOGLE_API_KEY'))
+# All calls go through the Gemini gateway, which owns rate limiting and retries
+llm = GatewayChatModel(model=ChatGoogleGenerativeAI(
+    model="gemini-2.5-flash", temperature=0, api_key=os.getenv('GOOGLE_API_KEY'),
+    base_url=GEMINI_BASE_URL, max_retries=1
+))
+decision_llm = GatewayChatModel(model=ChatGoogleGenerativeAI(
+    model="gemini-2.5-flash", temperature=0, api_key=os.getenv('GOOGLE_API_KEY'),
+    base_url=GEMINI_BASE_URL, max_retries=1
+))
 search_kwargs = 5
 
 system_prompt = """당신은 지식 기반에 로드된 주식&경제 뉴스를 바탕으로 주식&경제 뉴스에 대한 질문에 답변하는 지능적인 AI 비서입니다.
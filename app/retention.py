@@ -0,0 +1,192 @@
+import os
+import gzip
+import json
+import pytz
+from uuid import uuid4
+from datetime import datetime, timedelta
+from typing import List, Optional
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from app.database import engine, vector_store
+from app.models import Article, Author, ArticleSignature
+from app.dedup import promote_duplicates
+from app.indexing import index_to_chroma, article_to_news_item
+
+# Retention Settings
+RETENTION_DAYS = int(os.getenv("RETENTION_DAYS", "90"))
+ARCHIVE_DIR = os.getenv("ARCHIVE_DIR", "./archive")
+DELETE_BATCH_SIZE = 100
+
+kst = pytz.timezone('Asia/Seoul')
+
+
+def archive_old_articles(db: Session, max_age_days: int = RETENTION_DAYS) -> dict:
+    """
+    Moves articles older than `max_age_days` out of the hot stores.
+    1. Writes the expired articles (with authors) to a gzip-compressed JSONL archive.
+    2. Promotes surviving near-duplicates of archived canonical articles.
+    3. Deletes the articles from the SQL store.
+    4. Deletes their chunks from ChromaDB in batches, vacuums the SQL store,
+       and re-indexes the promoted near-duplicates.
+    The archive is written before anything is deleted, so a failed run never loses data.
+    """
+    now = datetime.now(kst).replace(tzinfo=None)  # recent_write is stored in KST
+    cutoff = now - timedelta(days=max_age_days)
+    articles = db.query(Article).filter(Article.recent_write < cutoff).order_by(Article.id).all()
+
+    if not articles:
+        print(f"No articles older than {cutoff.date()} to archive.")
+        return {"archived_count": 0, "deleted_chunks": 0, "archive_path": None}
+
+    archive_path = write_archive(articles)
+    print(f"Archived {len(articles)} articles to {archive_path}")
+
+    archived_ids = [article.id for article in articles]
+    urls = [article.url for article in articles]
+    try:
+        # Near-duplicates that stay lose the chunks stored under their archived canonical URL
+        survivors = promote_duplicates(db, archived_ids)
+
+        # Archived near-duplicates may point at a canonical article deleted in an earlier batch
+        for i in range(0, len(archived_ids), DELETE_BATCH_SIZE):
+            db.query(ArticleSignature).filter(
+                ArticleSignature.article_id.in_(archived_ids[i:i + DELETE_BATCH_SIZE]),
+                ArticleSignature.canonical_id.isnot(None),
+            ).update({"canonical_id": None, "similarity": None}, synchronize_session=False)
+
+        for i in range(0, len(articles), DELETE_BATCH_SIZE):
+            for article in articles[i:i + DELETE_BATCH_SIZE]:
+                db.delete(article)  # association, signature and LSH rows are removed by SQLAlchemy
+            db.flush()
+        db.commit()
+    except Exception as e:
+        print(f"Failed to delete archived articles: {e}")
+        db.rollback()
+        raise
+
+    # Chunks are only deleted once the articles are gone, so a failed run can simply be retried
+    deleted_chunks = delete_chunks_by_url(urls)
+    print(f"Deleted {deleted_chunks} chunks from ChromaDB.")
+
+    vacuum_database()
+
+    if survivors:
+        index_to_chroma([article_to_news_item(article) for article in survivors], percolate=False)
+
+    return {
+        "archived_count": len(articles),
+        "deleted_chunks": deleted_chunks,
+        "archive_path": archive_path,
+    }
+
+
+def write_archive(articles: List[Article]) -> str:
+    """
+    Writes articles to a new gzip-compressed JSONL file under ARCHIVE_DIR.
+    The name has a random suffix and the file is opened exclusively, so two
+    concurrent runs can never overwrite each other's archive.
+    """
+    os.makedirs(ARCHIVE_DIR, exist_ok=True)
+    filename = f"articles-{datetime.utcnow().strftime('%Y%m%dT%H%M%S')}-{uuid4().hex[:8]}.jsonl.gz"
+    path = os.path.join(ARCHIVE_DIR, filename)
+
+    with gzip.open(path, "xt", encoding="utf-8") as f:
+        for article in articles:
+            record = {
+                "title": article.title,
+                "url": article.url,
+                "content": article.content,
+                "recent_write": article.recent_write.isoformat() if article.recent_write else None,
+                "crawled_at": article.crawled_at.isoformat() if article.crawled_at else None,
+                "authors": [
+                    {"code": a.code, "name": a.name, "email": a.email, "team": a.team, "bf_team": a.bf_team}
+                    for a in article.authors
+                ],
+            }
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+    return path
+
+
+def delete_chunks_by_url(urls: List[str]) -> int:
+    """
+    Deletes every ChromaDB chunk belonging to the given article URLs, in batches.
+    """
+    deleted = 0
+    for i in range(0, len(urls), DELETE_BATCH_SIZE):
+        batch = urls[i:i + DELETE_BATCH_SIZE]
+        results = vector_store.get(where={"url": {"$in": batch}}, include=[])
+        ids = results.get("ids", []) if results else []
+        if ids:
+            vector_store.delete(ids=ids)
+            deleted += len(ids)
+    return deleted
+
+
+def vacuum_database():
+    """
+    Reclaims the disk space freed by deleted rows.
+    VACUUM cannot run inside a transaction, so an autocommit connection is used.
+    """
+    try:
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            conn.execute(text("VACUUM"))
+        print("Database vacuumed.")
+    except Exception as e:
+        print(f"Vacuum failed: {e}")
+
+
+def restore_archive(db: Session, path: str, reindex: bool = True) -> List[Article]:
+    """
+    Restores articles from an archive file back into the SQL store.
+    Articles whose URL already exists are skipped. If `reindex` is set,
+    the restored articles are indexed to ChromaDB again.
+    """
+    restored = []
+    author_cache = {}  # autoflush is off, so new authors are not visible to queries yet
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+
+            if db.query(Article).filter(Article.url == record["url"]).first():
+                continue
+
+            authors = []
+            for author_data in record.get("authors", []):
+                code = author_data["code"]
+                author_obj = author_cache.get(code) or db.query(Author).filter(Author.code == code).first()
+                if not author_obj:
+                    author_obj = Author(**author_data)
+                    db.add(author_obj)
+                author_cache[code] = author_obj
+                authors.append(author_obj)
+
+            article = Article(
+                title=record["title"],
+                url=record["url"],
+                content=record["content"],
+                recent_write=_parse_iso(record.get("recent_write")),
+                crawled_at=_parse_iso(record.get("crawled_at")),
+                authors=authors,
+            )
+            db.add(article)
+            restored.append(article)
+
+    try:
+        db.commit()
+    except Exception as e:
+        print(f"Failed to restore archive {path}: {e}")
+        db.rollback()
+        return []
+
+    print(f"Restored {len(restored)} articles from {path}")
+
+    if reindex and restored:
+        index_to_chroma([article_to_news_item(article) for article in restored], percolate=False)
+
+    return restored
+
+
+def _parse_iso(value: Optional[str]) -> Optional[datetime]:
+    return datetime.fromisoformat(value) if value else None
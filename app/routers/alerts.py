@@ -0,0 +1,107 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+from app.database import get_db
+from app.alerts import create_profile, delete_profile
+from app.models import Alert, InterestProfile
+from typing import List, Optional
+from pydantic import BaseModel, Field
+
+router = APIRouter(
+    prefix="/alerts",
+    tags=["alerts"],
+    responses={404: {"description": "Not found"}},
+)
+
+class ProfileRequest(BaseModel):
+    user_id: str
+    name: str
+    query: str
+    keywords: List[str] = []
+    threshold: Optional[float] = Field(None, ge=-1, le=1) # cosine similarity; None uses ALERT_SIMILARITY_THRESHOLD
+
+def profile_to_dict(profile: InterestProfile) -> dict:
+    return {
+        "id": profile.id,
+        "user_id": profile.user_id,
+        "name": profile.name,
+        "query": profile.query,
+        "keywords": profile.keywords or [],
+        "threshold": profile.threshold,
+        "created_at": profile.created_at.isoformat() if profile.created_at else None
+    }
+
+@router.post("/profiles")
+def add_profile(request: ProfileRequest, db: Session = Depends(get_db)):
+    """
+    Save an interest profile. Newly indexed articles are matched against it
+    and the matches show up in GET /alerts.
+    """
+    try:
+        profile = create_profile(db, request.user_id, request.name, request.query, request.keywords, request.threshold)
+        return {"status": "success", "data": profile_to_dict(profile)}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/profiles")
+async def list_profiles(user_id: str, db: Session = Depends(get_db)):
+    """
+    List the interest profiles of a user.
+    """
+    profiles = db.query(InterestProfile).filter(InterestProfile.user_id == user_id).order_by(InterestProfile.id).all()
+    return {"status": "success", "data": [profile_to_dict(p) for p in profiles]}
+
+@router.delete("/profiles/{profile_id}")
+async def remove_profile(profile_id: int, db: Session = Depends(get_db)):
+    """
+    Delete an interest profile and its alerts.
+    """
+    profile = db.get(InterestProfile, profile_id)
+    if not profile:
+        raise HTTPException(status_code=404, detail="Profile not found.")
+    try:
+        delete_profile(db, profile)
+        return {"status": "success", "message": "Profile deleted."}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("")
+async def list_alerts(user_id: str, unread_only: bool = True, limit: int = 50, db: Session = Depends(get_db)):
+    """
+    Alerts for a user's interest profiles, newest first.
+    """
+    query = db.query(Alert, InterestProfile.name).join(InterestProfile).filter(InterestProfile.user_id == user_id)
+    if unread_only:
+        query = query.filter(Alert.is_read == False)  # noqa: E712
+    rows = query.order_by(Alert.created_at.desc()).limit(limit).all()
+
+    return {
+        "status": "success",
+        "data": [
+            {
+                "id": alert.id,
+                "profile_id": alert.profile_id,
+                "profile_name": profile_name,
+                "title": alert.title,
+                "url": alert.article_url,
+                "score": alert.score,
+                "matched_keywords": alert.matched_keywords or [],
+                "is_read": alert.is_read,
+                "created_at": alert.created_at.isoformat() if alert.created_at else None
+            }
+            for alert, profile_name in rows
+        ]
+    }
+
+@router.post("/{alert_id}/read")
+async def mark_alert_read(alert_id: int, db: Session = Depends(get_db)):
+    """
+    Mark an alert as read.
+    """
+    alert = db.get(Alert, alert_id)
+    if not alert:
+        raise HTTPException(status_code=404, detail="Alert not found.")
+    alert.is_read = True
+    db.commit()
+    return {"status": "success", "message": "Alert marked as read."}
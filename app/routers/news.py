@@ -1,8 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, Query
 from sqlalchemy.orm import Session
-from app.database import get_db
+from app.database import get_db, SessionLocal
 from app.crawler import crawl_news
-from app.indexing import index_to_chroma
+from app.indexing import index_to_chroma, article_to_news_item
+from app.retention import archive_old_articles, RETENTION_DAYS
+from app.trends import get_rising_terms, KIND_KEYWORD, KIND_COMPANY
+from app.digest import get_digest, build_daily_digest
 from datetime import date
 from typing import Optional
 from pydantic import BaseModel
@@ -25,16 +28,7 @@ async def trigger_crawl(background_tasks: BackgroundTasks, db: Session = Depends
         new_articles = crawl_news(db)
         if new_articles:
             # Convert Article objects to dicts for indexing
-            news_items = []
-            for article in new_articles:
-                news_items.append({
-                    "id": str(article.id), # ID might be None if not flushed/refreshed, but crawl_news does refresh
-                    "title": article.title,
-                    "content": article.content,
-                    "url": article.url,
-                    "authors": [a.name for a in article.authors],
-                    "recent_write": article.recent_write
-                })
+            news_items = [article_to_news_item(article) for article in new_articles]
             
             background_tasks.add_task(index_to_chroma, news_items)
             return {"status": "success", "message": f"Crawled {len(new_articles)} articles. Indexing started in background."}
@@ -49,7 +43,7 @@ class DateRequest(BaseModel):
     date: date
 
 @router.post("/index-by-date")
-async def index_by_date(request: DateRequest, db: Session = Depends(get_db)):
+def index_by_date(request: DateRequest, db: Session = Depends(get_db)):
     """
     Index articles from the database that match the given date.
     Date format: YYYY-MM-DD
@@ -62,16 +56,7 @@ async def index_by_date(request: DateRequest, db: Session = Depends(get_db)):
              return {"status": "success", "message": "No new articles found."}
 
         # Convert to news_items format
-        news_items = []
-        for article in articles:
-            news_items.append({
-                "id": str(article.id),
-                "title": article.title,
-                "content": article.content,
-                "url": article.url,
-                "authors": [a.name for a in article.authors],
-                "recent_write": article.recent_write
-            })
+        news_items = [article_to_news_item(article) for article in articles]
             
         # Index to ChromaDB
         indexed, skipped = index_to_chroma(news_items)
@@ -88,3 +73,66 @@ async def index_by_date(request: DateRequest, db: Session = Depends(get_db)):
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+
+class ArchiveRequest(BaseModel):
+    max_age_days: int = RETENTION_DAYS
+
+@router.post("/archive")
+def archive_articles(request: ArchiveRequest, db: Session = Depends(get_db)):
+    """
+    Move articles older than `max_age_days` into the cold archive.
+    Their chunks are removed from ChromaDB and the SQL store is vacuumed.
+    """
+    try:
+        result = archive_old_articles(db, request.max_age_days)
+        return {"status": "success", "message": "Archiving complete.", "data": result}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/trends")
+async def get_trends(
+    days: int = Query(7, ge=1, le=90),
+    top_k: int = Query(20, ge=1, le=100),
+    kind: str = Query(KIND_KEYWORD, pattern=f"^({KIND_KEYWORD}|{KIND_COMPANY})$"),
+    db: Session = Depends(get_db)
+):
+    """
+    Top rising keywords or companies over the last `days` days,
+    compared to the `days` days before. Served from the daily aggregates.
+    """
+    try:
+        terms = get_rising_terms(db, days=days, top_k=top_k, kind=kind)
+        return {"status": "success", "data": {"days": days, "kind": kind, "terms": terms}}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/digest")
+async def read_digest(day: Optional[date] = None, db: Session = Depends(get_db)):
+    """
+    The precomputed morning digest for `day` (YYYY-MM-DD), or the latest one.
+    Built once a day after the scheduled crawl and served from cache.
+    """
+    digest = get_digest(db, day)
+    if not digest:
+        raise HTTPException(status_code=404, detail="Digest not found.")
+    return {"status": "success", "data": digest}
+
+def _build_digest_task(day: Optional[date]):
+    db = SessionLocal()
+    try:
+        build_daily_digest(db, day)
+    except Exception as e:
+        print(f"Digest build failed: {e}")
+    finally:
+        db.close()
+
+@router.post("/digest")
+async def trigger_digest(background_tasks: BackgroundTasks, day: Optional[date] = None):
+    """
+    Rebuild the digest for `day` (default: today) in the background.
+    """
+    background_tasks.add_task(_build_digest_task, day)
+    return {"status": "success", "message": "Digest build started in background."}
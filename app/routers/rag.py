@@ -18,7 +18,7 @@ class QueryResponse(BaseModel):
     documents: list[str]
 
 @router.post("/search", response_model=QueryResponse)
-async def search_news(request: QueryRequest):
+def search_news(request: QueryRequest):
     """
     Search news articles using RAG.
     """
@@ -2,7 +2,9 @@ from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.cron import CronTrigger
 from app.database import SessionLocal
 from app.crawler import crawl_news
-from app.indexing import index_to_chroma
+from app.indexing import index_to_chroma, article_to_news_item
+from app.digest import build_daily_digest
+from app.retention import archive_old_articles
 from datetime import datetime
 import pytz
 
@@ -13,14 +15,27 @@ def scheduled_crawl():
         new_items = crawl_news(db)
         if new_items:
             print(f"Crawled {len(new_items)} items. Starting indexing...")
-            index_to_chroma(new_items)
+            index_to_chroma([article_to_news_item(article) for article in new_items])
         else:
              print("No new items crawled.")
+        # One digest per day, built after indexing so today's chunks are in ChromaDB
+        build_daily_digest(db)
     except Exception as e:
         print(f"Scheduled crawl failed: {e}")
     finally:
         db.close()
 
+def scheduled_archive():
+    print(f"[{datetime.now()}] Starting scheduled archive...")
+    db = SessionLocal()
+    try:
+        result = archive_old_articles(db)
+        print(f"Archived {result['archived_count']} articles.")
+    except Exception as e:
+        print(f"Scheduled archive failed: {e}")
+    finally:
+        db.close()
+
 scheduler = BackgroundScheduler()
 
 # Schedule to run at 8:00 AM KST (Asia/Seoul)
@@ -28,3 +43,7 @@ kst = pytz.timezone('Asia/Seoul')
 trigger = CronTrigger(hour=8, minute=0, timezone=kst)
 
 scheduler.add_job(scheduled_crawl, trigger)
+
+# Archive expired articles at 3:00 AM KST, away from the morning crawl
+archive_trigger = CronTrigger(hour=3, minute=0, timezone=kst)
+scheduler.add_job(scheduled_archive, archive_trigger)
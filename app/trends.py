@@ -0,0 +1,210 @@
+import re
+from collections import Counter
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Set
+import pytz
+from sqlalchemy import case, func
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+from app.models import Article, ArticleSignature, TermDailyCount
+
+KIND_KEYWORD = "keyword"
+KIND_COMPANY = "company"
+
+# Only the most frequent keywords of each article are counted,
+# which bounds the number of aggregate rows per day.
+MAX_KEYWORDS_PER_ARTICLE = 20
+REBUILD_BATCH_SIZE = 500
+
+kst = pytz.timezone('Asia/Seoul')
+
+TOKEN_PATTERN = re.compile(r"[A-Za-z0-9]*[가-힣][가-힣A-Za-z0-9]*|[A-Za-z][A-Za-z0-9&\-]+")
+
+# Trailing particles and endings stripped from Korean tokens (longest first)
+KOREAN_SUFFIXES = sorted([
+    "에서는", "으로는", "에서", "에게", "으로", "까지", "부터", "보다", "처럼", "이라는", "라는",
+    "한다고", "했다고", "다고", "했다", "한다", "된다", "됐다", "하는", "하고", "했고", "이다", "였다",
+    "은", "는", "이", "가", "을", "를", "의", "에", "로", "와", "과", "도", "만",
+], key=len, reverse=True)
+
+STOPWORDS = {
+    "기자", "뉴스", "한경", "한국경제", "마켓인사이트", "무단전재", "재배포", "금지", "사진", "제공",
+    "지난", "올해", "작년", "이번", "현재", "관련", "통해", "대한", "위해", "따르면", "것으로",
+    "있다", "없다", "있는", "같은", "이후", "가운데", "최근", "오전", "오후", "대비", "수준",
+    "the", "and", "for", "with", "com", "www", "https", "http",
+}
+
+# Korean company names usually end with one of these
+COMPANY_SUFFIXES = (
+    "전자", "증권", "은행", "금융", "지주", "그룹", "홀딩스", "바이오", "제약", "화학", "건설",
+    "자동차", "생명", "화재", "카드", "캐피탈", "자산운용", "에너지", "중공업", "물산", "통신",
+    "반도체", "항공", "해운", "엔터", "솔루션", "테크", "파트너스", "인베스트먼트", "벤처스",
+)
+COMPANY_PREFIX_PATTERN = re.compile(r"\(주\)\s*([가-힣A-Za-z0-9]{2,})|㈜\s*([가-힣A-Za-z0-9]{2,})")
+
+
+def normalize_token(token: str) -> str:
+    if not ("가" <= token[-1] <= "힣"):
+        return token.upper() if token.isupper() else token.lower()
+    for suffix in KOREAN_SUFFIXES:
+        if token.endswith(suffix) and len(token) - len(suffix) >= 2:
+            return token[:-len(suffix)]
+    return token
+
+
+def is_company_name(term: str) -> bool:
+    """
+    A company name is a company suffix with a non-empty prefix ("삼성전자", not "전자").
+    """
+    return any(term.endswith(suffix) and len(term) > len(suffix) for suffix in COMPANY_SUFFIXES)
+
+
+def extract_terms(title: str, content: str) -> Dict[str, Set[str]]:
+    """
+    Extracts keywords and company names from an article.
+    Title tokens are weighted higher so headline topics rank first.
+    Returns {"keyword": set, "company": set}.
+    """
+    title = title or ""
+    content = content or ""
+
+    counts = Counter()
+    for weight, text in ((3, title), (1, content)):
+        for token in TOKEN_PATTERN.findall(text):
+            term = normalize_token(token)
+            # Skip stopwords (before and after suffix stripping) and leftover predicates
+            if len(term) < 2 or token.lower() in STOPWORDS or term.lower() in STOPWORDS or term.endswith("다"):
+                continue
+            counts[term] += weight
+
+    companies = {term for term in counts if is_company_name(term)}
+    for match in COMPANY_PREFIX_PATTERN.finditer(f"{title} {content}"):
+        companies.add(match.group(1) or match.group(2))
+
+    keywords = {term for term, _ in counts.most_common(MAX_KEYWORDS_PER_ARTICLE) if term not in companies}
+
+    return {KIND_KEYWORD: keywords, KIND_COMPANY: companies}
+
+
+def _article_day(article: Article) -> date:
+    return (article.recent_write or article.crawled_at or datetime.now(kst).replace(tzinfo=None)).date()
+
+
+def record_article_terms(db: Session, article: Article):
+    """
+    Increments the daily term counts for a newly crawled article.
+    The counters are upserted with `count = count + 1` in the database, so
+    concurrent crawls neither lose increments nor collide on the unique key.
+    Runs in a savepoint: a failed aggregate update never costs the article.
+    Does not commit; the caller commits it together with the article.
+    """
+    day = _article_day(article)
+    rows = [
+        {"day": day, "kind": kind, "term": term, "count": 1}
+        for kind, kind_terms in extract_terms(article.title, article.content).items()
+        for term in kind_terms
+    ]
+    if not rows:
+        return
+
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        insert = postgresql_insert
+    elif dialect == "sqlite":
+        insert = sqlite_insert
+    else:
+        print(f"Trend aggregates are not supported on {dialect}; skipping.")
+        return
+
+    stmt = insert(TermDailyCount).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["day", "kind", "term"],
+        set_={"count": TermDailyCount.count + 1},
+    )
+    try:
+        with db.begin_nested():
+            db.execute(stmt)
+    except Exception as e:
+        print(f"Failed to update trend counts for {article.url}: {e}")
+
+
+def get_rising_terms(db: Session, days: int = 7, top_k: int = 20, kind: str = KIND_KEYWORD) -> List[Dict]:
+    """
+    Returns the top rising terms of the last `days` days compared to the `days` before.
+    Only the aggregate rows of the two windows are scanned, never the articles.
+    """
+    today = datetime.now(kst).date()  # day keys come from recent_write, stored in KST
+    recent_start = today - timedelta(days=days - 1)
+    previous_start = recent_start - timedelta(days=days)
+
+    recent = func.sum(case((TermDailyCount.day >= recent_start, TermDailyCount.count), else_=0))
+    previous = func.sum(case((TermDailyCount.day < recent_start, TermDailyCount.count), else_=0))
+    rise = recent - previous
+
+    rows = (
+        db.query(TermDailyCount.term, recent.label("recent"), previous.label("previous"))
+        .filter(
+            TermDailyCount.kind == kind,
+            TermDailyCount.day >= previous_start,
+            TermDailyCount.day <= today,
+        )
+        .group_by(TermDailyCount.term)
+        .having(recent > 0)
+        .order_by(rise.desc(), recent.desc())
+        .limit(top_k)
+        .all()
+    )
+
+    return [
+        {
+            "term": row.term,
+            "recent_count": int(row.recent),
+            "previous_count": int(row.previous),
+            "growth": round((row.recent + 1) / (row.previous + 1), 2),
+        }
+        for row in rows
+    ]
+
+
+def rebuild_trend_counts(db: Session) -> int:
+    """
+    Recomputes the daily term counts from the articles in the SQL store.
+    Only days that still have articles are rebuilt, so aggregates of
+    fully archived days are kept. Returns the number of articles processed.
+    """
+    counts = Counter()
+    days = set()
+    processed = 0
+
+    # Near-duplicates are not counted at ingest either
+    query = (
+        db.query(Article)
+        .outerjoin(ArticleSignature, ArticleSignature.article_id == Article.id)
+        .filter(ArticleSignature.canonical_id.is_(None))
+        .order_by(Article.id)
+        .yield_per(REBUILD_BATCH_SIZE)
+    )
+    for article in query:
+        day = _article_day(article)
+        days.add(day)
+        for kind, kind_terms in extract_terms(article.title, article.content).items():
+            for term in kind_terms:
+                counts[(day, kind, term)] += 1
+        processed += 1
+
+    try:
+        if days:
+            db.query(TermDailyCount).filter(TermDailyCount.day.in_(days)).delete(synchronize_session=False)
+        db.bulk_insert_mappings(TermDailyCount, [
+            {"day": day, "kind": kind, "term": term, "count": count}
+            for (day, kind, term), count in counts.items()
+        ])
+        db.commit()
+    except Exception as e:
+        print(f"Failed to rebuild trend counts: {e}")
+        db.rollback()
+        raise
+
+    print(f"Rebuilt trend counts for {len(days)} days from {processed} articles.")
+    return processed
@@ -0,0 +1,29 @@
+import argparse
+from app.database import SessionLocal
+from app.retention import archive_old_articles, restore_archive, RETENTION_DAYS
+
+def main():
+    """
+    Archives old articles, or restores them from an archive file.
+    Usage:
+        python archive_db.py [--days N]
+        python archive_db.py --restore archive/articles-YYYYMMDDTHHMMSS-xxxxxxxx.jsonl.gz [--no-reindex]
+    """
+    parser = argparse.ArgumentParser(description="Archive or restore news articles.")
+    parser.add_argument("--days", type=int, default=RETENTION_DAYS, help="Archive articles older than this many days.")
+    parser.add_argument("--restore", metavar="PATH", help="Restore articles from an archive file.")
+    parser.add_argument("--no-reindex", action="store_true", help="Do not re-index restored articles to ChromaDB.")
+    args = parser.parse_args()
+
+    session = SessionLocal()
+    try:
+        if args.restore:
+            restore_archive(session, args.restore, reindex=not args.no_reindex)
+        else:
+            result = archive_old_articles(session, args.days)
+            print(f"Archive result: {result}")
+    finally:
+        session.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,21 @@
+from app.database import SessionLocal, engine
+from app.models import Base
+from app.dedup import backfill_signatures
+
+def backfill():
+    """
+    Registers near-duplicate signatures for articles crawled before
+    near-duplicate detection existed, so new copies of them are linked.
+    """
+    Base.metadata.create_all(bind=engine)
+    session = SessionLocal()
+    try:
+        print("Backfilling article signatures...")
+        backfill_signatures(session)
+    except Exception as e:
+        print(f"Error backfilling signatures: {e}")
+    finally:
+        session.close()
+
+if __name__ == "__main__":
+    backfill()
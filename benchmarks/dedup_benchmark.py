@@ -0,0 +1,169 @@
+"""
+Near-duplicate detection benchmark.
+
+Replays a fixture corpus in crawl order through the real ingest path
+(`link_near_duplicate` and `index_to_chroma`) and reports, per copy type, how
+many embedding calls (one per chunk) the MinHash/LSH near-duplicate index saves
+compared to the URL-only dedup. Each base article is followed by the copies Hankyung
+produces in practice: a republish under a new URL, an updated version with an
+extra paragraph, and a syndicated copy with a different header and footer.
+
+Runs offline; no API key is needed. The SQL store is an in-memory SQLite
+database and ChromaDB is replaced by an in-memory stub that counts embedded chunks.
+Usage:
+    python benchmarks/dedup_benchmark.py [path/to/corpus.jsonl]
+"""
+import os
+import sys
+import json
+import time
+import types
+from collections import Counter
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+FIXTURE_PATH = os.path.join(os.path.dirname(__file__), "fixtures", "dedup_corpus.jsonl")
+
+
+class StubVectorStore:
+    """
+    Keeps chunks in memory and answers the `get` filters the ingest path uses
+    (equality, `$in` and `$and` on metadata, or ids).
+    """
+
+    def __init__(self):
+        self.ids, self.documents, self.metadatas = [], [], []
+        self.embedded_chunks = 0
+
+    def add_documents(self, documents, ids):
+        self.embedded_chunks += len(documents)
+        self.ids.extend(ids)
+        self.documents.extend(doc.page_content for doc in documents)
+        self.metadatas.extend(dict(doc.metadata) for doc in documents)
+
+    def get(self, ids=None, where=None, include=None):
+        rows = [
+            i for i in range(len(self.ids))
+            if (ids is None or self.ids[i] in ids) and (where is None or _matches(self.metadatas[i], where))
+        ]
+        return {
+            "ids": [self.ids[i] for i in rows],
+            "documents": [self.documents[i] for i in rows],
+            "metadatas": [self.metadatas[i] for i in rows],
+            "embeddings": [[1.0, 0.0] for _ in rows],
+        }
+
+
+def _matches(metadata, where) -> bool:
+    for key, condition in where.items():
+        if key == "$and":
+            if not all(_matches(metadata, clause) for clause in condition):
+                return False
+        elif isinstance(condition, dict):
+            if metadata.get(key) not in condition["$in"]:
+                return False
+        elif metadata.get(key) != condition:
+            return False
+    return True
+
+
+# app.database connects to the real stores on import, so it is replaced before the app is imported
+engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+vector_store = StubVectorStore()
+sys.modules["app.database"] = types.SimpleNamespace(
+    engine=engine, SessionLocal=SessionLocal, vector_store=vector_store, embeddings=None
+)
+
+from app.models import Base, Article, ArticleSignature
+from app.dedup import link_near_duplicate
+from app.indexing import index_to_chroma, article_to_news_item, split_documents
+from langchain_core.documents import Document
+
+
+def load_corpus(path: str):
+    """
+    Expands each base article into the base plus three near-duplicate copies.
+    Returns (url, content, base_url) tuples in crawl order; the copy type is
+    the suffix of the url.
+    """
+    corpus = []
+    with open(path, encoding="utf-8") as f:
+        bases = [json.loads(line) for line in f if line.strip()]
+
+    for base in bases:
+        url, content = base["url"], base["content"]
+        corpus.append((url, content, url))
+    for i, base in enumerate(bases):
+        url, content = base["url"], base["content"]
+        corpus.append((f"{url}-republished", content, url))
+        corpus.append((
+            f"{url}-updated",
+            content + "\n(업데이트) 회사 측은 이날 오후 추가 설명 자료를 내고 관련 일정과 세부 내용을 공개했다. "
+                      "시장에서는 구체적인 수치가 나온 만큼 불확실성이 다소 해소됐다는 평가가 나왔다.",
+            url
+        ))
+        corpus.append((
+            f"{url}-syndicated",
+            f"[한경닷컴 제휴 {i}]\n" + content.replace("\n", "\n\n") + "\nⓒ 한국경제신문, 무단전재 및 재배포 금지",
+            url
+        ))
+    return corpus
+
+
+def run(path: str):
+    corpus = load_corpus(path)
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+
+    baseline_calls = Counter()
+    dedup_calls = Counter()
+    linked = 0
+    correct_links = 0
+    link_seconds = 0.0
+    published = datetime(2025, 1, 1, 9, 0)
+
+    try:
+        for n, (url, content, base_url) in enumerate(corpus):
+            copy_type = url[len(base_url) + 1:] or "original"
+            baseline_calls[copy_type] += len(split_documents([Document(page_content=content, metadata={})]))
+
+            article = Article(title=url, content=content, url=url, recent_write=published + timedelta(minutes=n))
+            db.add(article)
+
+            start = time.perf_counter()
+            canonical = link_near_duplicate(db, article)
+            link_seconds += time.perf_counter() - start
+            db.commit()
+
+            if canonical is not None:
+                linked += 1
+                correct_links += canonical.url == base_url
+
+            embedded = vector_store.embedded_chunks
+            index_to_chroma([article_to_news_item(article)])
+            dedup_calls[copy_type] += vector_store.embedded_chunks - embedded
+
+        canonical_count = db.query(ArticleSignature).filter(ArticleSignature.canonical_id.is_(None)).count()
+    finally:
+        db.close()
+
+    expected_links = sum(1 for url, _, base_url in corpus if url != base_url)
+
+    print(f"\nArticles:                     {len(corpus)} ({canonical_count} canonical)")
+    print(f"Near-duplicates linked:       {linked}/{expected_links} ({correct_links} to the right canonical)")
+    print(f"{'Embedding calls':<16} {'URL dedup':>10} {'near-dedup':>11} {'saved':>8}")
+    for copy_type in list(baseline_calls) + ["total"]:
+        baseline = sum(baseline_calls.values()) if copy_type == "total" else baseline_calls[copy_type]
+        deduped = sum(dedup_calls.values()) if copy_type == "total" else dedup_calls[copy_type]
+        print(f"{copy_type:<16} {baseline:>10} {deduped:>11} {(baseline - deduped) / baseline:>8.1%}")
+    print(f"Linking time per article:     {link_seconds / len(corpus) * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    run(sys.argv[1] if len(sys.argv) > 1 else FIXTURE_PATH)
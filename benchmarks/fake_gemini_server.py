@@ -0,0 +1,126 @@
+"""
+Local fake of the Gemini REST API for exercising the LLM gateway without quota.
+
+Implements generateContent, embedContent and batchEmbedContents for any model.
+Requests above `--rps` in a one-second window get a 429 RESOURCE_EXHAUSTED,
+like the real API does when a quota is exceeded.
+
+Usage:
+    python benchmarks/fake_gemini_server.py [--port 8089] [--rps 5]
+    GEMINI_BASE_URL=http://127.0.0.1:8089 GOOGLE_API_KEY=fake uv run uvicorn main:app
+"""
+import json
+import time
+import hashlib
+import argparse
+import threading
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+EMBEDDING_SIZE = 768
+
+
+def fake_embedding(text: str):
+    digest = hashlib.sha256(text.encode("utf-8")).digest()
+    return [digest[i % len(digest)] / 255 for i in range(EMBEDDING_SIZE)]
+
+
+class FakeGeminiServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, requests_per_second: float = 5, latency: float = 0.05):
+        super().__init__(address, FakeGeminiHandler)
+        self.requests_per_second = requests_per_second
+        self.latency = latency
+        self.stats = Counter()
+        self.embed_batch_sizes = []
+        self._window = []
+        self._lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def admit(self, kind: str) -> bool:
+        with self._lock:
+            now = time.monotonic()
+            self._window = [t for t in self._window if now - t < 1]
+            if len(self._window) >= self.requests_per_second:
+                self.stats["rejected"] += 1
+                self.stats[f"rejected_{kind}"] += 1
+                return False
+            self._window.append(now)
+            return True
+
+
+class FakeGeminiHandler(BaseHTTPRequestHandler):
+    server: FakeGeminiServer
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status: int, body: dict):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        body = json.loads(self.rfile.read(length) or b"{}")
+        path = self.path.split("?")[0]
+
+        if not self.server.admit("generate" if path.endswith(":generateContent") else "embed"):
+            self._send(429, {"error": {"code": 429, "message": "Resource has been exhausted (e.g. check quota).",
+                                       "status": "RESOURCE_EXHAUSTED"}})
+            return
+        time.sleep(self.server.latency)
+
+        if path.endswith(":generateContent"):
+            self.server.stats["generate"] += 1
+            prompt = " ".join(
+                part.get("text", "") for content in body.get("contents", []) for part in content.get("parts", [])
+            )
+            self._send(200, {
+                "candidates": [{
+                    "content": {"role": "model", "parts": [{"text": f"yes. fake answer for {len(prompt)} chars"}]},
+                    "finishReason": "STOP",
+                }],
+                "usageMetadata": {"promptTokenCount": len(prompt) // 3 + 1, "candidatesTokenCount": 8,
+                                  "totalTokenCount": len(prompt) // 3 + 9},
+            })
+        elif path.endswith(":batchEmbedContents"):
+            requests = body.get("requests", [])
+            self.server.stats["embed"] += 1
+            self.server.embed_batch_sizes.append(len(requests))
+            self._send(200, {"embeddings": [
+                {"values": fake_embedding(" ".join(p.get("text", "") for p in r["content"]["parts"]))}
+                for r in requests
+            ]})
+        elif path.endswith(":embedContent"):
+            self.server.stats["embed"] += 1
+            self.server.embed_batch_sizes.append(1)
+            text = " ".join(p.get("text", "") for p in body.get("content", {}).get("parts", []))
+            self._send(200, {"embedding": {"values": fake_embedding(text)}})
+        else:
+            self._send(404, {"error": {"code": 404, "message": f"Unknown path {path}", "status": "NOT_FOUND"}})
+
+
+def start_server(port: int = 0, requests_per_second: float = 5, latency: float = 0.05) -> FakeGeminiServer:
+    server = FakeGeminiServer(("127.0.0.1", port), requests_per_second, latency)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fake Gemini API server.")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--rps", type=float, default=5, help="Requests per second before returning 429.")
+    args = parser.parse_args()
+
+    server = FakeGeminiServer(("127.0.0.1", args.port), args.rps)
+    print(f"Fake Gemini server listening on {server.url}")
+    server.serve_forever()
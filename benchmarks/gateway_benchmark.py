@@ -0,0 +1,149 @@
+"""
+LLM gateway benchmark against the local fake Gemini server.
+
+Fires concurrent interactive chat calls and query embeddings together with
+background chat calls (digest summaries) and document embeddings (short texts
+and 1000-character article chunks from the dedup fixture, as indexing sends), first straight at the clients (with their
+own default retries) and then through the gateway, and reports failures, API
+calls, embedding batch sizes, latency per priority and, for the gateway, how
+long each priority waited to be admitted by each rate limiter.
+
+Runs offline; no API key is needed.
+Usage:
+    python benchmarks/gateway_benchmark.py
+"""
+import os
+import sys
+import json
+import math
+import time
+import statistics
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# The fake server admits 5 requests/s shared by both kinds; the gateway budgets
+# add up to just below it, as they would be configured against a real quota.
+os.environ.setdefault("GEMINI_CHAT_RPM", "120")
+os.environ.setdefault("GEMINI_EMBED_RPM", "150")
+os.environ.setdefault("GEMINI_RETRY_BASE_DELAY", "0.2")
+os.environ.setdefault("GEMINI_RETRY_MAX_DELAY", "2")
+
+from langchain_core.messages import HumanMessage
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+from langchain_google_genai import ChatGoogleGenerativeAI, GoogleGenerativeAIEmbeddings
+from app.llm_gateway import GatewayChatModel, GatewayEmbeddings, gateway, PRIORITY_INTERACTIVE, PRIORITY_BACKGROUND
+from fake_gemini_server import start_server
+
+CHAT_CALLS = 20
+SUMMARY_CALLS = 10
+QUERY_CALLS = 30
+DOCUMENT_CALLS = 150
+ARTICLE_CALLS = 15
+CHUNKS_PER_ARTICLE_CALL = 20
+FIXTURE_PATH = os.path.join(os.path.dirname(__file__), "fixtures", "dedup_corpus.jsonl")
+
+
+def load_article_chunks():
+    """
+    Chunks of the fixture articles split like app.indexing.split_documents does,
+    numbered so that every embedded text is distinct.
+    """
+    splitter = RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=200)
+    with open(FIXTURE_PATH, encoding="utf-8") as f:
+        chunks = [chunk for line in f if line.strip() for chunk in splitter.split_text(json.loads(line)["content"])]
+    total = ARTICLE_CALLS * CHUNKS_PER_ARTICLE_CALL
+    return [f"{chunks[i % len(chunks)]} ({i})" for i in range(total)]
+
+
+def make_clients(base_url: str, **chat_options):
+    chat = ChatGoogleGenerativeAI(model="gemini-2.5-flash", api_key="fake", base_url=base_url, **chat_options)
+    embeddings = GoogleGenerativeAIEmbeddings(model="models/text-embedding-004", google_api_key="fake", base_url=base_url)
+    return chat, embeddings
+
+
+def run_workload(chat, background_chat, embeddings):
+    def timed(kind, fn):
+        start = time.perf_counter()
+        try:
+            fn()
+            return kind, time.perf_counter() - start, None
+        except Exception as e:
+            return kind, time.perf_counter() - start, e
+
+    article_chunks = load_article_chunks()
+    jobs = (
+        [("interactive", lambda i=i: chat.invoke([HumanMessage(content=f"삼성전자 전망 {i}")])) for i in range(CHAT_CALLS)]
+        + [("interactive", lambda i=i: embeddings.embed_query(f"금리 인하 {i}")) for i in range(QUERY_CALLS)]
+        + [("background", lambda i=i: background_chat.invoke([HumanMessage(content=f"주제 {i} 요약")]))
+           for i in range(SUMMARY_CALLS)]
+        + [("background", lambda i=i: embeddings.embed_documents([f"문서 {i}-{j}" for j in range(1 + i % 5)]))
+           for i in range(DOCUMENT_CALLS)]
+        + [("background", lambda i=i: embeddings.embed_documents(
+            article_chunks[i * CHUNKS_PER_ARTICLE_CALL:(i + 1) * CHUNKS_PER_ARTICLE_CALL]))
+           for i in range(ARTICLE_CALLS)]
+    )
+    # Background work is queued first, as when indexing is running when users arrive
+    jobs.sort(key=lambda job: job[0] != "background")
+
+    with ThreadPoolExecutor(max_workers=64) as pool:
+        return list(pool.map(lambda job: timed(*job), jobs))
+
+
+def report(name, results, server):
+    failures = [error for _, _, error in results if error]
+    print(f"\n== {name} ==")
+    print(f"Calls:           {len(results)} ({len(failures)} failed)")
+    if failures:
+        print(f"First failure:   {type(failures[0]).__name__}: {str(failures[0])[:80]}")
+    print(f"API requests:    generate={server.stats['generate']} embed={server.stats['embed']} "
+          f"rejected(429)={server.stats['rejected']}")
+    if server.embed_batch_sizes:
+        print(f"Embed batch:     avg {statistics.mean(server.embed_batch_sizes):.1f} texts, "
+              f"max {max(server.embed_batch_sizes)}")
+    for kind in ("interactive", "background"):
+        latencies = sorted(seconds for k, seconds, error in results if k == kind and not error)
+        if latencies:
+            p95 = latencies[math.ceil(len(latencies) * 0.95) - 1]
+            print(f"{kind:<16} p50 {statistics.median(latencies):.2f}s  p95 {p95:.2f}s")
+
+
+def report_limiters(server):
+    """
+    Admission waits per limiter and priority: interactive calls should be
+    admitted ahead of the background calls queued before them. Each admission
+    should be exactly one API request, 429s included.
+    """
+    names = {PRIORITY_INTERACTIVE: "interactive", PRIORITY_BACKGROUND: "background"}
+    print("Admission wait per limiter:")
+    for kind, limiter in gateway.limiters.items():
+        for priority, stats in limiter.stats().items():
+            print(f"  {kind:<6} {names.get(priority, priority):<12} {stats['admitted']:>4} admitted  "
+                  f"avg {stats['avg_wait']:.2f}s  p95 {stats['p95_wait']:.2f}s")
+    for kind, stat in (("chat", "generate"), ("embed", "embed")):
+        admitted = sum(stats["admitted"] for stats in gateway.limiters[kind].stats().values())
+        requests = server.stats[stat] + server.stats[f"rejected_{stat}"]
+        print(f"  {kind:<6} {admitted} admissions, {requests} API requests")
+
+
+def main():
+    server = start_server(requests_per_second=5)
+    chat, embeddings = make_clients(server.url)
+    report("Direct clients", run_workload(chat, chat, embeddings), server)
+    server.shutdown()
+
+    server = start_server(requests_per_second=5)
+    # Behind the gateway the client makes a single attempt, as app/rag_graph.py configures it
+    chat, embeddings = make_clients(server.url, max_retries=1)
+    workload = run_workload(
+        GatewayChatModel(model=chat),
+        GatewayChatModel(model=chat, priority=PRIORITY_BACKGROUND),
+        GatewayEmbeddings(embeddings),
+    )
+    report("Through the gateway", workload, server)
+    report_limiters(server)
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
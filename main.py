@@ -29,7 +29,7 @@ async def root():
     return {"message": "Welcome to News RAG API"}
 
 from fastapi.middleware.cors import CORSMiddleware
-from app.routers import news, rag
+from app.routers import news, rag, alerts
 
 app.add_middleware(
     CORSMiddleware,
@@ -41,6 +41,7 @@ app.add_middleware(
 
 app.include_router(news.router)
 app.include_router(rag.router)
+app.include_router(alerts.router)
 
 if __name__ == "__main__":
     uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
@@ -0,0 +1,20 @@
+from app.database import SessionLocal, engine
+from app.models import Base
+from app.trends import rebuild_trend_counts
+
+def rebuild():
+    """
+    Backfills the daily trend aggregates from the articles in the database.
+    """
+    Base.metadata.create_all(bind=engine)
+    session = SessionLocal()
+    try:
+        print("Rebuilding trend aggregates...")
+        rebuild_trend_counts(session)
+    except Exception as e:
+        print(f"Error rebuilding trends: {e}")
+    finally:
+        session.close()
+
+if __name__ == "__main__":
+    rebuild()